@@ -0,0 +1,57 @@
+"""
+Pytest fixtures for the top-level SDK test script.
+
+Built once per session, so running test_python_sdk.py under pytest does the
+client and timestamp setup a single time (once per worker under pytest-xdist).
+"""
+
+import os
+
+import pytest
+
+from test_python_sdk import _FROZEN_NOW, CASES, get_client, init_client
+
+# The hooks below only apply to tests in this file
+SCRIPT = "test_python_sdk.py"
+# Tests that need a running server; set TRACELOOP_SKIP_SERVER_TESTS=1 to skip them
+SERVER_TESTS = {"test_server_connection"}
+
+
+def in_script(item):
+    """Whether a collected item comes from the test script"""
+    return item.path.name == SCRIPT
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The Traceloop client shared by all tests"""
+    return init_client()
+
+
+@pytest.fixture(scope="session")
+def now():
+    """The fixed timestamp used to build traces and spans"""
+    return _FROZEN_NOW
+
+
+def pytest_generate_tests(metafunc):
+    """Run tests that take a case once per entry in CASES"""
+    if in_script(metafunc.definition) and "case" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "case", CASES, ids=[description for description, _ in CASES]
+        )
+
+
+def pytest_runtest_setup(item):
+    """Skip server-dependent tests when asked to"""
+    if (
+        os.environ.get("TRACELOOP_SKIP_SERVER_TESTS") == "1"
+        and in_script(item)
+        and item.name in SERVER_TESTS
+    ):
+        pytest.skip("TRACELOOP_SKIP_SERVER_TESTS is set")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Drop the cached client so a new session initializes the SDK afresh"""
+    get_client.cache_clear()
@@ -8,11 +8,41 @@ This script demonstrates all the working features of the traceloop system:
 - Integration between Python SDK and Go server
 """
 
-import traceloop
-import requests
+import sys
 import time
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import traceloop
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; format_json falls back to the stdlib
+    orjson = None
+
+BASE = "http://localhost:8080"
+
+# One keep-alive session shared by every probe, created on first use so an
+# early exit never pays for importing requests
+_SESSION = None
+
+def get_session():
+    """Return the shared HTTP session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _SESSION = requests.Session()
+        _SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return _SESSION
+
+def format_json(obj):
+    """Pretty-print obj as JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    import json
+
+    return json.dumps(obj, indent=2)
 
 def print_header(title):
     """Print a formatted header."""
@@ -31,15 +61,15 @@ def check_server_status():
     
     try:
         # Health check
-        response = requests.get("http://localhost:8080/health", timeout=5)
+        response = get_session().get(f"{BASE}/health", timeout=5)
         if response.status_code == 200:
             print("✅ Server is running and healthy")
             
             # Get stats
-            stats_response = requests.get("http://localhost:8080/api/v1/stats", timeout=5)
+            stats_response = get_session().get(f"{BASE}/api/v1/stats", timeout=5)
             if stats_response.status_code == 200:
                 stats = stats_response.json()
-                print(f"📊 Current stats: {json.dumps(stats, indent=2)}")
+                print(f"📊 Current stats: {format_json(stats)}")
             
             return True
         else:
@@ -52,6 +82,57 @@ def check_server_status():
         print("   ./build/traceloop server --port 8080")
         return False
 
+# Traced functions used by the demos, decorated once at import time
+@traceloop.trace("demo-function")
+def demo_function(name: str, value: int) -> str:
+    time.sleep(0.1)
+    return f"Hello {name}, your value is {value}"
+
+@traceloop.trace_agent("demo-agent")
+def demo_agent(task: str) -> str:
+    time.sleep(0.1)
+    return f"Agent processed: {task}"
+
+@traceloop.trace_llm("demo-llm", capture_prompts=True)
+def demo_llm(prompt: str) -> str:
+    time.sleep(0.1)
+    return f"LLM response to: {prompt}"
+
+@traceloop.trace("data-validation")
+def validate_data(data: list) -> bool:
+    time.sleep(0.05)
+    return len(data) > 0 and all(isinstance(x, (int, float)) for x in data)
+
+@traceloop.trace("data-processing")
+def process_data(data: list) -> dict:
+    time.sleep(0.1)
+    count = len(data)
+    total = sum(data)
+    return {
+        "count": count,
+        "sum": total,
+        "average": total / count,
+        "min": min(data),
+        "max": max(data)
+    }
+
+@traceloop.trace("result-formatting")
+def format_result(stats: dict) -> str:
+    time.sleep(0.05)
+    return f"Processed {stats['count']} items, avg: {stats['average']:.2f}"
+
+# Complex workflow with multiple traces
+@traceloop.trace_agent("workflow-orchestrator")
+def orchestrate_workflow(data: list) -> dict:
+    """Orchestrate a complex workflow."""
+    if not validate_data(data):
+        raise ValueError("Invalid data")
+    
+    stats = process_data(data)
+    result = format_result(stats)
+    
+    return {"stats": stats, "result": result}
+
 def demo_python_sdk():
     """Demonstrate Python SDK features."""
     print_section("Python SDK Demo")
@@ -63,22 +144,6 @@ def demo_python_sdk():
     )
     print("✅ Traceloop SDK initialized")
     
-    # Test decorators
-    @traceloop.trace("demo-function")
-    def demo_function(name: str, value: int) -> str:
-        time.sleep(0.1)
-        return f"Hello {name}, your value is {value}"
-    
-    @traceloop.trace_agent("demo-agent")
-    def demo_agent(task: str) -> str:
-        time.sleep(0.1)
-        return f"Agent processed: {task}"
-    
-    @traceloop.trace_llm("demo-llm", capture_prompts=True)
-    def demo_llm(prompt: str) -> str:
-        time.sleep(0.1)
-        return f"LLM response to: {prompt}"
-    
     # Run decorated functions
     result1 = demo_function("World", 42)
     print(f"✅ Function result: {result1}")
@@ -93,9 +158,10 @@ def demo_python_sdk():
     trace = traceloop.start_trace("manual-demo")
     print(f"✅ Started manual trace: {trace.trace_id}")
     
-    traceloop.add_event(trace.trace_id, "step-1", action="initialization")
-    traceloop.add_event(trace.trace_id, "step-2", action="processing")
-    traceloop.add_event(trace.trace_id, "step-3", action="completion")
+    with traceloop.batch(trace.trace_id) as batch:
+        batch.add_event("step-1", action="initialization")
+        batch.add_event("step-2", action="processing")
+        batch.add_event("step-3", action="completion")
     
     traceloop.end_trace(trace.trace_id)
     print("✅ Manual trace completed")
@@ -110,12 +176,21 @@ def demo_api_endpoints():
         ("/api/v1/stats", "Get Statistics")
     ]
     
-    for endpoint, description in endpoints:
+    # The probes are independent GETs, so issue them concurrently and report
+    # the results in the original order
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = [
+            (executor.submit(session.get, f"{BASE}{endpoint}", timeout=5), description)
+            for endpoint, description in endpoints
+        ]
+    
+    for future, description in futures:
         try:
-            response = requests.get(f"http://localhost:8080{endpoint}", timeout=5)
+            response = future.result()
             if response.status_code == 200:
                 data = response.json()
-                print(f"✅ {description}: {json.dumps(data, indent=2)}")
+                print(f"✅ {description}: {format_json(data)}")
             else:
                 print(f"❌ {description}: HTTP {response.status_code}")
         except Exception as e:
@@ -125,41 +200,6 @@ def demo_advanced_tracing():
     """Demonstrate advanced tracing features."""
     print_section("Advanced Tracing Demo")
     
-    # Complex workflow with multiple traces
-    @traceloop.trace_agent("workflow-orchestrator")
-    def orchestrate_workflow(data: list) -> dict:
-        """Orchestrate a complex workflow."""
-        
-        @traceloop.trace("data-validation")
-        def validate_data(data: list) -> bool:
-            time.sleep(0.05)
-            return len(data) > 0 and all(isinstance(x, (int, float)) for x in data)
-        
-        @traceloop.trace("data-processing")
-        def process_data(data: list) -> dict:
-            time.sleep(0.1)
-            return {
-                "count": len(data),
-                "sum": sum(data),
-                "average": sum(data) / len(data),
-                "min": min(data),
-                "max": max(data)
-            }
-        
-        @traceloop.trace("result-formatting")
-        def format_result(stats: dict) -> str:
-            time.sleep(0.05)
-            return f"Processed {stats['count']} items, avg: {stats['average']:.2f}"
-        
-        # Execute workflow
-        if not validate_data(data):
-            raise ValueError("Invalid data")
-        
-        stats = process_data(data)
-        result = format_result(stats)
-        
-        return {"stats": stats, "result": result}
-    
     # Test the workflow
     test_data = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
     try:
@@ -171,6 +211,8 @@ def demo_advanced_tracing():
 
 def main():
     """Run the complete demo."""
+    from datetime import datetime
+
     print_header("Traceloop Complete Demo")
     print(f"🕐 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -190,10 +232,10 @@ def main():
     # Final status check
     print_section("Final Status")
     try:
-        response = requests.get("http://localhost:8080/api/v1/stats", timeout=5)
+        response = get_session().get(f"{BASE}/api/v1/stats", timeout=5)
         if response.status_code == 200:
             stats = response.json()
-            print(f"📊 Final server stats: {json.dumps(stats, indent=2)}")
+            print(f"📊 Final server stats: {format_json(stats)}")
     except Exception as e:
         print(f"❌ Failed to get final stats: {e}")
     
@@ -208,4 +250,4 @@ def main():
 
 if __name__ == "__main__":
     success = main()
-    exit(0 if success else 1)
+    sys.exit(0 if success else 1)
@@ -6,10 +6,37 @@ This example demonstrates basic traceloop functionality without requiring
 external AI libraries like OpenAI or LangChain.
 """
 
+import asyncio
 import traceloop
+import operator
+import re
 import time
 import random
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; process_data falls back to builtins
+    np = None
+
+# Below this size converting to an array costs more than the vectorized reduction saves
+NUMPY_MIN_SIZE = 64
+
+# Dispatch table for math_agent, looked up once instead of chained string compares
+OPERATIONS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+}
+
+# Mock LLM replies keyed by the first keyword found in the prompt
+MOCK_PATTERN = re.compile(r"(weather|joke|help)", re.IGNORECASE)
+MOCK_REPLIES = {
+    "weather": "The weather is sunny and 72°F",
+    "joke": "Why don't scientists trust atoms? Because they make up everything!",
+    "help": "I'm here to help! What would you like to know?",
+}
+
 # Initialize traceloop
 traceloop.init(
     endpoint="http://localhost:8080",
@@ -17,38 +44,27 @@ traceloop.init(
 )
 
 @traceloop.trace_agent("math-agent")
-def math_agent(operation: str, a: float, b: float) -> float:
+async def math_agent(operation: str, a: float, b: float) -> float:
     """A simple math agent that performs basic operations."""
-    time.sleep(0.1)  # Simulate processing time
+    await asyncio.sleep(0.1)  # Simulate processing time
     
-    if operation == "add":
-        return a + b
-    elif operation == "subtract":
-        return a - b
-    elif operation == "multiply":
-        return a * b
-    elif operation == "divide":
-        if b != 0:
-            return a / b
-        else:
-            raise ValueError("Cannot divide by zero")
-    else:
+    op = OPERATIONS.get(operation)
+    if op is None:
         raise ValueError(f"Unknown operation: {operation}")
+    if op is operator.truediv and b == 0:
+        raise ValueError("Cannot divide by zero")
+    return op(a, b)
 
 @traceloop.trace_llm("mock-llm", capture_prompts=True)
-def mock_llm_call(prompt: str, temperature: float = 0.7) -> str:
+async def mock_llm_call(prompt: str, temperature: float = 0.7) -> str:
     """Mock LLM call for demonstration purposes."""
-    time.sleep(0.2)  # Simulate API call delay
+    await asyncio.sleep(0.2)  # Simulate API call delay
     
     # Simple mock responses based on prompt keywords
-    if "weather" in prompt.lower():
-        return "The weather is sunny and 72°F"
-    elif "joke" in prompt.lower():
-        return "Why don't scientists trust atoms? Because they make up everything!"
-    elif "help" in prompt.lower():
-        return "I'm here to help! What would you like to know?"
-    else:
-        return f"I received your message: '{prompt}'. How can I assist you?"
+    match = MOCK_PATTERN.search(prompt)
+    if match:
+        return MOCK_REPLIES[match.group(1).lower()]
+    return f"I received your message: '{prompt}'. How can I assist you?"
 
 @traceloop.trace("data-processing")
 def process_data(data: list) -> dict:
@@ -58,14 +74,31 @@ def process_data(data: list) -> dict:
     if not data:
         return {"count": 0, "sum": 0, "average": 0}
     
+    if np is not None and len(data) >= NUMPY_MIN_SIZE:
+        arr = np.asarray(data, dtype=np.float64)
+        total = float(arr.sum())
+        return {
+            "count": int(arr.size),
+            "sum": total,
+            "average": total / arr.size,
+            "min": float(arr.min()),
+            "max": float(arr.max())
+        }
+    
+    count = len(data)
+    total = sum(data)
     return {
-        "count": len(data),
-        "sum": sum(data),
-        "average": sum(data) / len(data),
+        "count": count,
+        "sum": total,
+        "average": total / count,
         "min": min(data),
         "max": max(data)
     }
 
+async def gather_all(*calls):
+    """Run coroutines concurrently, returning exceptions instead of raising."""
+    return await asyncio.gather(*calls, return_exceptions=True)
+
 def main():
     """Main function demonstrating traceloop usage."""
     print("🚀 Traceloop Simple Example")
@@ -73,18 +106,16 @@ def main():
     
     # Test math agent
     print("\n🧮 Testing Math Agent:")
-    try:
-        result = math_agent("add", 10, 5)
-        print(f"  10 + 5 = {result}")
-        
-        result = math_agent("multiply", 7, 8)
-        print(f"  7 × 8 = {result}")
-        
-        result = math_agent("divide", 20, 4)
-        print(f"  20 ÷ 4 = {result}")
-        
-    except Exception as e:
-        print(f"  Math agent error: {e}")
+    results = asyncio.run(gather_all(
+        math_agent("add", 10, 5),
+        math_agent("multiply", 7, 8),
+        math_agent("divide", 20, 4)
+    ))
+    for label, result in zip(["10 + 5", "7 × 8", "20 ÷ 4"], results):
+        if isinstance(result, Exception):
+            print(f"  Math agent error: {result}")
+        else:
+            print(f"  {label} = {result}")
     
     # Test mock LLM
     print("\n🤖 Testing Mock LLM:")
@@ -95,17 +126,19 @@ def main():
         "How do I learn Python?"
     ]
     
-    for prompt in prompts:
-        try:
-            response = mock_llm_call(prompt, temperature=0.8)
+    responses = asyncio.run(gather_all(
+        *[mock_llm_call(prompt, temperature=0.8) for prompt in prompts]
+    ))
+    for prompt, response in zip(prompts, responses):
+        if isinstance(response, Exception):
+            print(f"  LLM error: {response}")
+        else:
             print(f"  Q: {prompt}")
             print(f"  A: {response}")
-        except Exception as e:
-            print(f"  LLM error: {e}")
     
     # Test data processing
     print("\n📊 Testing Data Processing:")
-    test_data = [random.randint(1, 100) for _ in range(10)]
+    test_data = random.choices(range(1, 101), k=10)
     print(f"  Input data: {test_data}")
     
     try:
@@ -124,9 +157,10 @@ def main():
         time.sleep(0.1)
         
         # Add events
-        traceloop.add_event(trace.trace_id, "step-1", action="initialization")
-        traceloop.add_event(trace.trace_id, "step-2", action="processing")
-        traceloop.add_event(trace.trace_id, "step-3", action="completion")
+        with traceloop.batch(trace.trace_id) as batch:
+            batch.add_event("step-1", action="initialization")
+            batch.add_event("step-2", action="processing")
+            batch.add_event("step-3", action="completion")
         
         # End trace
         traceloop.end_trace(trace.trace_id)
@@ -3,138 +3,156 @@
 Update the status page with latest validation results from JSON file
 """
 
+import functools
 import json
 import os
+import re
 from datetime import datetime
 
+# Each pattern below is applied in a single pass over the whole document
+LAST_UPDATED_PATTERN = re.compile(r'id="lastUpdated">[^<]*</span>')
+STEP_PATTERN = re.compile(
+    r'(<li\s+class="step-item"\s+data-test="([^"]+)"\s*>)(.*?)(</li>)', re.DOTALL
+)
+OVERALL_PATTERN = re.compile(
+    r'<span class="status-indicator status-working"></span>'
+    r'|<strong>Core functionality working</strong>'
+    r'|The main Go \+ Python workflow is solid, but Docker and Homebrew methods need fixes\.'
+)
+
+# Step item internals, tolerant of whitespace and line breaks in the template
+INDICATOR_PATTERN = re.compile(
+    r'<span\s+class="status-indicator\s+status-unknown"\s*>\s*</span>'
+)
+STATUS_TEXT_PATTERN = re.compile(
+    r'(<span\s+class="status-text"\s*>)\s*Loading\.\.\.\s*(</span>)'
+)
+NOTES_PATTERN = re.compile(r'(<div\s+class="step-notes"\s*>)\s*(</div>)')
+
+# Test status -> indicator class
+STATUS_CLASS = {
+    "working": "status-working",
+    "broken": "status-broken",
+    "partial": "status-partial",
+}
+
+# Overall status -> (summary text, indicator class)
+OVERALL = {
+    "broken": ("Multiple issues detected", "status-broken"),
+    "partial": ("Some issues need attention", "status-partial"),
+    "working": ("Core functionality working", "status-working"),
+}
+
+# Map test names to HTML elements
+TEST_MAPPING = {
+    'go_install': 'Go Installation',
+    'docker_install': 'Docker Installation',
+    'homebrew_install': 'Homebrew Installation',
+    'server_health': 'HTTP Server',
+    'server_traces_api': 'Traces API',
+    'server_stats_api': 'Stats API',
+    'python_install': 'Installation',
+    'python_import': 'Basic Tracing',
+    'simple_example': 'Simple Test',
+    'test_script': 'Test Script'
+}
+
 def load_status_data():
     """Load status data from JSON file"""
     status_file = "../traceloop-website/status.json"
-    if os.path.exists(status_file):
+    try:
         with open(status_file, 'r') as f:
             return json.load(f)
-    return None
+    except FileNotFoundError:
+        return None
+
+@functools.lru_cache(maxsize=256)
+def render_step_body(step_body, status_class, status_text, test_notes):
+    """Render the inside of a step item; identical inputs recur across updates"""
+    step_body = INDICATOR_PATTERN.sub(
+        f'<span class="status-indicator {status_class}"></span>', step_body
+    )
+    step_body = STATUS_TEXT_PATTERN.sub(
+        lambda m: f'{m.group(1)}{status_text}{m.group(2)}', step_body
+    )
+
+    # Update notes if available
+    if test_notes and test_notes.strip():
+        step_body = NOTES_PATTERN.sub(
+            lambda m: f'{m.group(1)}{test_notes}{m.group(2)}', step_body
+        )
+
+    return step_body
+
+def render_step(match, updates):
+    """Rewrite a single step item using the update for its data-test key"""
+    opening, test_key, step_body, closing = match.groups()
+    if test_key not in updates:
+        return match.group(0)
+
+    return f'{opening}{render_step_body(step_body, *updates[test_key])}{closing}'
 
 def update_status_html(status_data):
     """Update the status.html file with latest data"""
     html_file = "../traceloop-website/status.html"
     
-    if not os.path.exists(html_file):
+    # Read current HTML
+    try:
+        with open(html_file, 'r') as f:
+            html_content = f.read()
+    except FileNotFoundError:
         print(f"Status HTML file not found: {html_file}")
         return
     
-    # Read current HTML
-    with open(html_file, 'r') as f:
-        html_content = f.read()
-    
     if not status_data:
         print("No status data available")
         return
     
-    # Update last updated time
-    last_updated = status_data.get('last_updated', datetime.now().isoformat())
-    # Find and replace the last updated time in the HTML
-    import re
-    pattern = r'id="lastUpdated">[^<]*</span>'
-    replacement = f'id="lastUpdated">{last_updated}</span>'
-    html_content = re.sub(pattern, replacement, html_content)
-    
-    # Update overall status
     overall_status = status_data.get('overall_status', 'unknown')
     working_count = status_data.get('working_count', 0)
     total_count = status_data.get('total_count', 0)
     
-    # Update status indicators based on test results
-    tests = status_data.get('tests', {})
-    
-    # Map test names to HTML elements
-    test_mapping = {
-        'go_install': 'Go Installation',
-        'docker_install': 'Docker Installation', 
-        'homebrew_install': 'Homebrew Installation',
-        'server_health': 'HTTP Server',
-        'server_traces_api': 'Traces API',
-        'server_stats_api': 'Stats API',
-        'python_install': 'Installation',
-        'python_import': 'Basic Tracing',
-        'simple_example': 'Simple Test',
-        'test_script': 'Test Script'
-    }
-    
-    # Update individual test statuses
-    for test_key, test_name in test_mapping.items():
-        if test_key in tests:
-            test_status = tests[test_key]['status']
-            test_notes = tests[test_key].get('notes', '')
-            
-            # Determine status class
-            status_class = "status-unknown"
-            if test_status == "working":
-                status_class = "status-working"
-            elif test_status == "broken":
-                status_class = "status-broken"
-            elif test_status == "partial":
-                status_class = "status-partial"
-            
-            # Find the step item with data-test attribute
-            pattern = rf'<li class="step-item" data-test="{test_key}">.*?</li>'
-            match = re.search(pattern, html_content, re.DOTALL)
-            if match:
-                # Extract the existing step item
-                step_item = match.group(0)
-                
-                # Update the status indicator and text
-                step_item = re.sub(
-                    r'<span class="status-indicator status-unknown"></span>',
-                    f'<span class="status-indicator {status_class}"></span>',
-                    step_item
-                )
-                step_item = re.sub(
-                    r'<span class="status-text">Loading\.\.\.</span>',
-                    f'<span class="status-text">{test_status.title()}</span>',
-                    step_item
-                )
-                
-                # Update notes if available
-                if test_notes and test_notes.strip():
-                    step_item = re.sub(
-                        r'<div class="step-notes"></div>',
-                        f'<div class="step-notes">{test_notes}</div>',
-                        step_item
-                    )
-                
-                # Replace the step item in the HTML
-                html_content = html_content.replace(match.group(0), step_item)
-    
     # Update overall status section
-    overall_status_text = "Core functionality working"
-    overall_status_class = "status-working"
-    
-    if overall_status == "broken":
-        overall_status_text = "Multiple issues detected"
-        overall_status_class = "status-broken"
-    elif overall_status == "partial":
-        overall_status_text = "Some issues need attention"
-        overall_status_class = "status-partial"
-    
-    # Update overall status indicator
-    html_content = html_content.replace(
-        '<span class="status-indicator status-working"></span>',
-        f'<span class="status-indicator {overall_status_class}"></span>'
+    overall_status_text, overall_status_class = OVERALL.get(
+        overall_status, OVERALL["working"]
     )
     
-    html_content = html_content.replace(
-        '<strong>Core functionality working</strong>',
-        f'<strong>{overall_status_text}</strong>'
+    progress_text = f"{working_count}/{total_count} tests passing"
+    overall_replacements = {
+        '<span class="status-indicator status-working"></span>':
+            f'<span class="status-indicator {overall_status_class}"></span>',
+        '<strong>Core functionality working</strong>':
+            f'<strong>{overall_status_text}</strong>',
+        'The main Go + Python workflow is solid, but Docker and Homebrew methods need fixes.':
+            f'Progress: {progress_text}. The main Go + Python workflow is solid, but some installation methods need fixes.',
+    }
+    # Rewritten before the step items so their new indicators are left untouched
+    html_content = OVERALL_PATTERN.sub(
+        lambda m: overall_replacements[m.group(0)], html_content
     )
     
-    # Update progress text
-    progress_text = f"{working_count}/{total_count} tests passing"
-    html_content = html_content.replace(
-        'The main Go + Python workflow is solid, but Docker and Homebrew methods need fixes.',
-        f'Progress: {progress_text}. The main Go + Python workflow is solid, but some installation methods need fixes.'
+    # Update last updated time
+    last_updated = status_data.get('last_updated', datetime.now().isoformat())
+    html_content = LAST_UPDATED_PATTERN.sub(
+        f'id="lastUpdated">{last_updated}</span>', html_content
     )
     
+    # Update status indicators based on test results
+    tests = status_data.get('tests', {})
+    
+    # Collect the per-test updates, then rewrite every step item in one pass
+    updates = {}
+    for test_key in TEST_MAPPING:
+        if test_key in tests:
+            test_status = tests[test_key]['status']
+            updates[test_key] = (
+                STATUS_CLASS.get(test_status, "status-unknown"),
+                test_status.title(),
+                tests[test_key].get('notes', ''),
+            )
+    
+    html_content = STEP_PATTERN.sub(lambda m: render_step(m, updates), html_content)
+    
     # Write updated HTML
     with open(html_file, 'w') as f:
         f.write(html_content)
@@ -1,10 +1,40 @@
+import asyncio
+import gc
+import inspect
+import json
+import sys
+import threading
+import weakref
 from datetime import datetime
 
+import orjson
 import pytest
 
 import traceloop
 from traceloop.client import TraceloopClient
-from traceloop.types import Span, Trace, TraceStatus
+from traceloop.context import (
+    clear_context,
+    get_current_span,
+    get_current_trace,
+    set_current_trace,
+)
+from traceloop.types import Span, Trace, TraceContext, TraceStatus
+
+
+@pytest.fixture
+def span_updates(monkeypatch):
+    """Initialize the default client and record its span updates.
+
+    Each update is an (attributes, status) pair. The previous default client is
+    restored afterwards.
+    """
+    monkeypatch.setattr(traceloop, "_default_client", traceloop._default_client)
+    client = traceloop.init(endpoint="http://localhost:8080")
+    updates = []
+    client.update_span = lambda span_id, attributes, status: updates.append(
+        (attributes, status)
+    )
+    return updates
 
 
 def test_traceloop_init():
@@ -55,6 +85,30 @@ def test_span_creation():
     assert span.status == TraceStatus.OK
 
 
+def test_span_defaults_are_not_shared():
+    """Test that omitted span collections get fresh, unshared defaults"""
+    now = datetime.now()
+    span1 = Span("span-1", "test-trace-1", None, "span-1", now, None, TraceStatus.OK)
+    span2 = Span("span-2", "test-trace-1", None, "span-2", now, None, TraceStatus.OK)
+
+    span1.attributes["key"] = "value"
+    span1.events.append({"name": "event"})
+
+    assert span2.attributes == {}
+    assert span2.events == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slots need Python 3.10+")
+def test_span_and_trace_use_slots():
+    """Test that spans and traces do not carry a per-instance __dict__"""
+    now = datetime.now()
+    span = Span("span-1", "test-trace-1", None, "span-1", now, None, TraceStatus.OK)
+    trace = Trace("test-trace-1", "test-trace", now, None, TraceStatus.OK)
+
+    assert not hasattr(span, "__dict__")
+    assert not hasattr(trace, "__dict__")
+
+
 def test_trace_with_spans():
     """Test trace with spans"""
     now = datetime.now()
@@ -100,6 +154,18 @@ def test_trace_with_spans():
     assert trace.spans[1].name == "span-2"
 
 
+def test_start_trace_generates_hex_ids():
+    """Test that trace and span IDs are 128-bit and 64-bit hex strings"""
+    client = TraceloopClient(endpoint="http://localhost:8080")
+    trace_context = client.start_trace("test-trace")
+
+    assert len(trace_context.trace_id) == 32
+    assert len(trace_context.span_id) == 16
+    int(trace_context.trace_id, 16)
+    int(trace_context.span_id, 16)
+    assert client.start_trace("test-trace").trace_id != trace_context.trace_id
+
+
 def test_client_creation():
     """Test client creation with custom settings"""
     client = TraceloopClient(
@@ -113,5 +179,489 @@ def test_client_creation():
     assert client.service_name == "test-service"
 
 
+def test_trace_captures_arguments(span_updates):
+    """Test that call arguments and defaults are captured as span attributes"""
+
+    @traceloop.trace()
+    def greet(name: str, punctuation: str = "!", repeat: int = 1) -> str:
+        return (name + punctuation) * repeat
+
+    @traceloop.trace()
+    def join(*parts, sep: str = " ") -> str:
+        return sep.join(parts)
+
+    assert greet("hi", repeat=2) == "hi!hi!"
+    assert join("a", "b") == "a b"
+
+    (greet_attributes, _), (join_attributes, _) = span_updates
+    assert greet_attributes["function.args.name"] == "hi"
+    assert greet_attributes["function.args.punctuation"] == "!"
+    assert greet_attributes["function.args.repeat"] == 2
+    assert join_attributes["function.args.parts.type"] == "tuple"
+    assert join_attributes["function.args.sep"] == " "
+
+
+def test_trace_records_errors(span_updates):
+    """Test that sync and async errors are recorded, and re-raised by default"""
+
+    @traceloop.trace()
+    def fail():
+        raise ValueError("bad input")
+
+    @traceloop.trace(ignore_errors=True)
+    async def fail_quietly():
+        raise KeyError("missing")
+
+    with pytest.raises(ValueError):
+        fail()
+    assert asyncio.run(fail_quietly()) is None
+
+    (sync_attributes, sync_status), (async_attributes, async_status) = span_updates
+    assert sync_status is TraceStatus.ERROR
+    assert sync_attributes["error.type"] == "ValueError"
+    assert sync_attributes["error.message"] == "bad input"
+    assert async_status is TraceStatus.ERROR
+    assert async_attributes["error.type"] == "KeyError"
+    assert get_current_trace() is None
+
+
+def test_trace_records_cancellation(span_updates):
+    """Test that a cancelled coroutine is recorded as cancelled and re-raised"""
+
+    @traceloop.trace(ignore_errors=True)
+    async def wait():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+    ((attributes, status),) = span_updates
+    assert status is TraceStatus.CANCELLED
+    assert "error.type" not in attributes
+
+
+def test_disabled_and_unsampled_calls_are_not_traced(monkeypatch, span_updates):
+    """Test that disabled or unsampled calls skip span bookkeeping"""
+
+    @traceloop.trace()
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    traceloop.set_enabled(False)
+    try:
+        assert add(1, 2) == 3
+    finally:
+        traceloop.set_enabled(True)
+
+    traceloop.get_client().sample_rate = 0.0
+    assert add(1, 2) == 3
+    assert span_updates == []
+
+    monkeypatch.setenv("TRACELOOP_DISABLED", "1")
+
+    def sub(a: int, b: int) -> int:
+        return a - b
+
+    assert traceloop.trace()(sub) is sub
+
+
+@pytest.mark.parametrize(
+    "value, expected", [("often", 1.0), ("nan", 1.0), ("1.5", 1.0), ("-2", 0.0)]
+)
+def test_bad_sample_rate_env_is_tolerated(monkeypatch, value, expected):
+    """Test that a malformed or out-of-range sample rate warns instead of failing"""
+    monkeypatch.setenv("TRACELOOP_SAMPLE_RATE", value)
+    with pytest.warns(UserWarning, match="TRACELOOP_SAMPLE_RATE"):
+        client = TraceloopClient(endpoint="http://localhost:8080")
+    assert client.sample_rate == expected
+
+
+def test_sampling_decision_is_inherited_by_nested_calls(monkeypatch, span_updates):
+    """Test that nested calls follow the sampling decision of their root call"""
+    monkeypatch.setenv("TRACELOOP_SAMPLE_RATE", "0.25")
+    assert TraceloopClient(endpoint="http://localhost:8080").sample_rate == 0.25
+
+    traces = []
+
+    @traceloop.trace()
+    def child():
+        traces.append(get_current_trace())
+        return "child"
+
+    @traceloop.trace(sample_rate=0.0)
+    def unsampled_root():
+        return child()
+
+    @traceloop.trace()
+    def sampled_root():
+        traces.append(get_current_trace())
+        return child()
+
+    assert unsampled_root() == "child"
+    assert span_updates == []
+    assert get_current_trace() is None
+
+    assert sampled_root() == "child"
+    assert len(span_updates) == 2
+    unsampled, root, nested = traces
+    assert not unsampled.sampled
+    assert nested is root and root.sampled
+    assert get_current_trace() is None
+
+
+def test_agent_and_llm_decorators_add_a_single_wrapper(span_updates):
+    """Test that trace_agent and trace_llm wrap the function only once"""
+
+    def plan(task: str) -> str:
+        return task
+
+    def complete(prompt: str) -> str:
+        return prompt
+
+    agent = traceloop.trace_agent()(plan)
+    llm = traceloop.trace_llm(model_name="gpt-4")(complete)
+
+    assert agent.__wrapped__ is plan
+    assert llm.__wrapped__ is complete
+    assert agent("research") == "research"
+    assert llm("hello") == "hello"
+    (agent_attributes, _), (llm_attributes, _) = span_updates
+    assert agent_attributes["agent.name"] == "plan"
+    assert llm_attributes["llm.model"] == "gpt-4"
+
+
+def test_traced_calls_before_init_are_noops(monkeypatch):
+    """Test that traced functions run untraced before traceloop.init()"""
+    monkeypatch.setattr(traceloop, "_default_client", None)
+
+    @traceloop.trace(sample_rate=1.0)
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    assert get_current_trace() is None
+    assert traceloop.get_client().flush()
+
+    noop_client = traceloop.get_client()
+    assert noop_client.start_trace("a") is not noop_client.start_trace("b")
+
+
+def test_unsampled_roots_do_not_share_attributes(span_updates):
+    """Test that attributes set during one unsampled trace do not leak to another"""
+    seen = []
+
+    @traceloop.trace(sample_rate=0.0)
+    def tag_user():
+        traceloop.set_trace_attribute("user.id", "alice")
+        seen.append(get_current_trace())
+
+    @traceloop.trace(sample_rate=0.0)
+    def other():
+        seen.append(get_current_trace())
+
+    tag_user()
+    other()
+
+    assert seen[0] is not seen[1]
+    assert seen[1].attributes == {}
+    assert not seen[1].sampled
+    assert span_updates == []
+
+
+def test_current_trace_is_thread_local():
+    """Test that the current trace is per thread and can be cleared"""
+    trace_context = TraceContext(
+        trace_id="test-trace-1", span_id=None, service_name="test-service"
+    )
+    set_current_trace(trace_context)
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(get_current_trace()))
+    thread.start()
+    thread.join()
+
+    assert get_current_trace() is trace_context
+    assert seen == [None]
+
+    clear_context()
+    assert get_current_trace() is None
+
+
+def test_concurrent_tasks_get_separate_traces():
+    """Test that concurrent root coroutines on one thread do not share a trace"""
+    traceloop.init(endpoint="http://localhost:8080")
+
+    @traceloop.trace()
+    async def root(delay: float):
+        trace_id = get_current_trace().trace_id
+        await asyncio.sleep(delay)
+        return trace_id, get_current_trace().trace_id
+
+    async def main():
+        return await asyncio.gather(root(0.02), root(0.01))
+
+    (first_before, first_after), (second_before, second_after) = asyncio.run(main())
+
+    assert first_before == first_after
+    assert second_before == second_after
+    assert first_before != second_before
+
+
+def test_set_trace_attribute():
+    """Test that trace attributes are set only when a trace is current"""
+    clear_context()
+    traceloop.set_trace_attribute("user.id", "user-1")
+
+    trace_context = TraceContext(
+        trace_id="test-trace-1", span_id=None, service_name="test-service"
+    )
+    set_current_trace(trace_context)
+    traceloop.set_trace_attribute("user.id", "user-1")
+    clear_context()
+
+    assert trace_context.attributes == {"user.id": "user-1"}
+
+
+def test_span_stack_tracks_nested_calls():
+    """Test that open spans are tracked innermost-first and released on return"""
+    traceloop.init(endpoint="http://localhost:8080")
+    seen = []
+
+    @traceloop.trace(name="inner")
+    def inner():
+        seen.append(get_current_span().name)
+
+    @traceloop.trace(name="outer")
+    def outer():
+        seen.append(get_current_span().name)
+        inner()
+        seen.append(get_current_span().name)
+
+    outer()
+
+    assert seen == ["outer", "inner", "outer"]
+    assert get_current_span() is None
+
+
+def test_event_batch_flushes_once():
+    """Test that batched events are sent in a single call on exit"""
+    client = TraceloopClient(endpoint="http://localhost:8080")
+    calls = []
+    client.add_events = lambda trace_id, events: calls.append((trace_id, events))
+
+    with client.batch("test-trace-1") as batch:
+        batch.add_event("step-1", action="initialization")
+        batch.add_event("step-2", action="processing")
+        assert calls == []
+
+    assert len(calls) == 1
+    trace_id, events = calls[0]
+    assert trace_id == "test-trace-1"
+    assert [event.name for event in events] == ["step-1", "step-2"]
+    assert events[0].attributes == {"action": "initialization"}
+    assert batch.events == []
+
+
+def test_trace_async_function(span_updates):
+    """Test that async functions are traced once awaited"""
+
+    @traceloop.trace("async-op")
+    async def double(value: int) -> int:
+        await asyncio.sleep(0)
+        return value * 2
+
+    assert inspect.iscoroutinefunction(double)
+    assert asyncio.run(double(21)) == 42
+    ((attributes, status),) = span_updates
+    assert attributes["function.args.value"] == 21
+    assert attributes["function.result"] == 42
+    assert status == TraceStatus.OK
+
+
+def test_send_trace_batches_queued_traces():
+    """Test that queued traces are posted in batches and drained on shutdown"""
+    client = TraceloopClient(endpoint="http://localhost:8080", max_batch_size=2)
+    batches = []
+    client._post_batch = lambda traces: batches.append(traces) or True
+
+    traces = [
+        Trace(
+            trace_id=f"test-trace-{i}",
+            name="test-trace",
+            start_time=datetime.now(),
+            end_time=None,
+            status=TraceStatus.OK,
+            spans=[],
+            attributes={},
+            service_name="test-service",
+        )
+        for i in range(3)
+    ]
+    for trace in traces:
+        assert client.send_trace(trace)
+
+    client.shutdown()
+
+    assert all(len(batch) <= 2 for batch in batches)
+    assert [trace for batch in batches for trace in batch] == traces
+    assert not client.send_trace(traces[0])
+
+
+def test_unreferenced_client_is_collected():
+    """Test that a client with a running worker is not kept alive by the SDK"""
+    client = TraceloopClient(endpoint="http://localhost:8080", flush_interval=0.01)
+    client._post_batch = lambda traces: True
+    client.send_trace(
+        Trace(
+            trace_id="test-trace-1",
+            name="test-trace",
+            start_time=datetime.now(),
+            end_time=None,
+            status=TraceStatus.OK,
+        )
+    )
+    worker = client._worker
+    client_ref = weakref.ref(client)
+
+    del client
+    worker.join(timeout=2)
+    gc.collect()
+
+    assert not worker.is_alive()
+    assert client_ref() is None
+
+
+def test_post_batch_serializes_traces():
+    """Test the JSON payload posted for a batch of traces"""
+    client = TraceloopClient(endpoint="http://localhost:8080")
+    posted = []
+
+    class Response:
+        status_code = 200
+
+    def post(url, data, timeout):
+        posted.append((url, orjson.loads(data)))
+        return Response()
+
+    client.session.post = post
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    span = Span(
+        span_id="span-1",
+        trace_id="test-trace-1",
+        parent_span_id=None,
+        name="span-1",
+        start_time=now,
+        end_time=None,
+        status=TraceStatus.OK,
+        attributes={"key": "value"},
+        events=[],
+    )
+    trace = Trace(
+        trace_id="test-trace-1",
+        name="test-trace",
+        start_time=now,
+        end_time=now,
+        status=TraceStatus.OK,
+        spans=[span],
+        attributes={},
+        service_name="test-service",
+    )
+
+    assert client._post_batch([trace])
+
+    url, payload = posted[0]
+    assert url == "http://localhost:8080/api/v1/traces/batch"
+    assert payload[0]["start_time"] == "2024-01-01T12:00:00"
+    assert payload[0]["spans"][0]["span_id"] == "span-1"
+    assert payload[0]["spans"][0]["start_time_unix_nano"] == (
+        int(now.timestamp()) * 1_000_000_000
+    )
+    assert payload[0]["spans"][0]["attributes"] == {"key": "value"}
+    # The trace ID and unset or empty span fields are left out of the payload
+    assert "trace_id" not in payload[0]["spans"][0]
+    assert "parent_span_id" not in payload[0]["spans"][0]
+    assert "end_time_unix_nano" not in payload[0]["spans"][0]
+    assert "events" not in payload[0]["spans"][0]
+
+
+def test_post_batch_encodes_oversized_ints():
+    """Test that an int too wide for orjson does not drop the batch"""
+    client = TraceloopClient(endpoint="http://localhost:8080")
+    posted = []
+
+    class Response:
+        status_code = 200
+
+    def post(url, data, timeout):
+        posted.append(json.loads(data))
+        return Response()
+
+    client.session.post = post
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    traces = [
+        Trace(
+            trace_id=f"test-trace-{i}",
+            name="test-trace",
+            start_time=now,
+            end_time=now,
+            status=TraceStatus.OK,
+            attributes=attributes,
+            service_name="test-service",
+        )
+        for i, attributes in enumerate([{}, {"user_id": 2**64}])
+    ]
+
+    assert client._post_batch(traces)
+
+    payload = posted[0]
+    assert [trace["trace_id"] for trace in payload] == ["test-trace-0", "test-trace-1"]
+    assert payload[1]["attributes"] == {"user_id": 2**64}
+    assert payload[1]["start_time"] == "2024-01-01T12:00:00"
+
+
+def test_span_times_accept_epoch_nanoseconds():
+    """Test that integer nanosecond timestamps are sent unchanged"""
+    start_ns = 1_704_110_400_000_000_123
+    span = Span(
+        span_id="span-1",
+        trace_id="test-trace-1",
+        parent_span_id=None,
+        name="span-1",
+        start_time=start_ns,
+        end_time=start_ns + 1_000,
+        status=TraceStatus.OK,
+    )
+
+    span_data = TraceloopClient._span_to_dict(span)
+
+    assert span_data["start_time_unix_nano"] == start_ns
+    assert span_data["end_time_unix_nano"] == start_ns + 1_000
+
+
+def test_trace_times_accept_epoch_nanoseconds():
+    """Test that integer trace timestamps are sent as ISO-8601, like datetimes"""
+    start_ns = 1_704_110_400_000_000_123
+    trace = Trace(
+        trace_id="test-trace-1",
+        name="test-trace",
+        start_time=start_ns,
+        end_time=start_ns + 1_500_000,
+        status=TraceStatus.OK,
+        service_name="test-service",
+    )
+
+    payload = orjson.loads(orjson.dumps(TraceloopClient._trace_to_dict(trace)))
+
+    assert payload["start_time"] == "2024-01-01T12:00:00+00:00"
+    assert payload["end_time"] == "2024-01-01T12:00:00.001500+00:00"
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -11,14 +11,17 @@ __email__ = "shailesh@traceloop-ai.dev"
 
 from typing import Optional
 
-from .client import TraceloopClient
+from .client import EventBatch, TraceloopClient, _NoopClient
 from .context import get_current_trace, set_trace_attribute
-from .decorators import trace, trace_agent, trace_llm
+from .decorators import set_enabled, trace, trace_agent, trace_llm
 from .types import Span, Trace, TraceStatus
 
 # Main client instance
 _default_client = None
 
+# Stands in for the default client until init() is called
+_noop_client = _NoopClient()
+
 
 def init(
     endpoint: str = "http://localhost:8080",
@@ -46,10 +49,12 @@ def init(
 
 
 def get_client() -> TraceloopClient:
-    """Get the default client instance."""
-    if _default_client is None:
-        raise RuntimeError("Traceloop not initialized. Call traceloop.init() first.")
-    return _default_client
+    """Get the default client instance.
+
+    Before init() is called this is a no-op client, so traced code runs
+    normally and nothing is recorded.
+    """
+    return _default_client or _noop_client
 
 
 # Convenience functions that use the default client
@@ -68,6 +73,11 @@ def add_event(trace_id: str, name: str, **attributes):
     return get_client().add_event(trace_id, name, **attributes)
 
 
+def batch(trace_id: str) -> EventBatch:
+    """Buffer events for a trace and send them together using the default client."""
+    return get_client().batch(trace_id)
+
+
 # Export all public symbols
 __all__ = [
     "__version__",
@@ -76,12 +86,15 @@ __all__ = [
     "start_trace",
     "end_trace",
     "add_event",
+    "batch",
     "trace",
     "trace_agent",
     "trace_llm",
+    "set_enabled",
     "get_current_trace",
     "set_trace_attribute",
     "TraceloopClient",
+    "EventBatch",
     "Trace",
     "Span",
     "TraceStatus",
@@ -2,12 +2,115 @@
 Traceloop client for sending traces to the server.
 """
 
-import uuid
-from typing import Any, Dict, Optional
+import atexit
+import json
+import math
+import os
+import threading
+import warnings
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
 
-import requests
+import orjson
 
-from .types import Trace, TraceContext, TraceStatus
+from .ids import generate_trace_and_span_ids
+from .types import Span, Timestamp, Trace, TraceContext, TraceEvent, TraceStatus
+
+# Clients with a running worker, shut down at exit. Held weakly so that a client
+# replaced by a later init() can still be garbage collected.
+_live_clients: "weakref.WeakSet[TraceloopClient]" = weakref.WeakSet()
+
+
+def _shutdown_live_clients():
+    for client in list(_live_clients):
+        client.shutdown()
+
+
+atexit.register(_shutdown_live_clients)
+
+
+def _unix_nano(dt: Timestamp) -> int:
+    """Convert a timestamp to integer nanoseconds since the Unix epoch."""
+    if isinstance(dt, int):
+        return dt
+    # Whole seconds are exact as a float; microseconds are added as integers
+    seconds = int(dt.replace(microsecond=0).timestamp())
+    return seconds * 1_000_000_000 + dt.microsecond * 1_000
+
+
+def _to_datetime(ts: Optional[Timestamp]) -> Optional[datetime]:
+    """Convert epoch nanoseconds to a UTC datetime; datetimes pass through."""
+    if not isinstance(ts, int):
+        return ts
+    seconds, nanos = divmod(ts, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(
+        microsecond=nanos // 1_000
+    )
+
+
+def _sample_rate_from_env() -> float:
+    """Read TRACELOOP_SAMPLE_RATE, clamped to [0, 1]; 1.0 if unset or invalid."""
+    value = os.environ.get("TRACELOOP_SAMPLE_RATE")
+    if value is None:
+        return 1.0
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = math.nan
+    if math.isnan(rate):
+        warnings.warn(f"Ignoring invalid TRACELOOP_SAMPLE_RATE {value!r}")
+        return 1.0
+    if not 0.0 <= rate <= 1.0:
+        warnings.warn(f"TRACELOOP_SAMPLE_RATE {value!r} is outside [0, 1]; clamping")
+        rate = min(max(rate, 0.0), 1.0)
+    return rate
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode_batch(payload: List[Dict[str, Any]]) -> bytes:
+    """Encode a batch payload as JSON.
+
+    orjson rejects integers wider than 64 bits, which traced arguments may hold;
+    such a batch falls back to the stdlib encoder instead of being dropped.
+    """
+    try:
+        return orjson.dumps(payload)
+    except TypeError:
+        return json.dumps(payload, default=_json_default).encode()
+
+
+class EventBatch:
+    """Buffers events for a trace and sends them in a single call on exit."""
+
+    def __init__(self, client: "TraceloopClient", trace_id: str):
+        self.client = client
+        self.trace_id = trace_id
+        self.events: List[TraceEvent] = []
+
+    def __enter__(self) -> "EventBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def add_event(self, name: str, **attributes):
+        """Buffer an event; it is sent when the batch is flushed."""
+        self.events.append(
+            TraceEvent(name=name, timestamp=datetime.now(), attributes=attributes)
+        )
+
+    def flush(self):
+        """Send all buffered events with one client call."""
+        if self.events:
+            self.client.add_events(self.trace_id, self.events)
+            self.events = []
 
 
 class TraceloopClient:
@@ -18,19 +121,59 @@ class TraceloopClient:
         endpoint: str = "http://localhost:8080",
         api_key: Optional[str] = None,
         service_name: Optional[str] = None,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        flush_interval: float = 0.2,
+        pool_maxsize: int = 64,
+        sample_rate: Optional[float] = None,
         **kwargs,
     ):
         self.endpoint = endpoint.rstrip("/")
         self.api_key = api_key
         self.service_name = service_name or "unknown-service"
+        # Fraction of traces that are recorded, from TRACELOOP_SAMPLE_RATE if unset
+        if sample_rate is None:
+            sample_rate = _sample_rate_from_env()
+        self.sample_rate = sample_rate
+        # Imported here so that importing the SDK without a client stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         self.session = requests.Session()
 
+        # Keep connections to the endpoint warm and retry transient gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.1,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["POST"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Traces are queued by send_trace and posted in batches by a background
+        # worker, started on first use. When the queue is full the oldest
+        # traces are dropped.
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: Deque[Trace] = deque(maxlen=max_queue_size)
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._shutdown = False
+
         # Set up headers
         if self.api_key:
             self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
 
         self.session.headers.update(
             {
+                "Connection": "keep-alive",
                 "Content-Type": "application/json",
                 "User-Agent": "traceloop-python-sdk/0.1.0",
             }
@@ -38,11 +181,11 @@ class TraceloopClient:
 
     def start_trace(self, name: str, **attributes) -> TraceContext:
         """Start a new trace."""
-        trace_id = str(uuid.uuid4())
+        trace_id, span_id = generate_trace_and_span_ids()
 
         trace_context = TraceContext(
             trace_id=trace_id,
-            span_id=str(uuid.uuid4()),
+            span_id=span_id,
             service_name=self.service_name,
             attributes={
                 "trace.name": name,
@@ -67,6 +210,16 @@ class TraceloopClient:
         print(f"Adding event '{name}' to trace {trace_id}")
         return True
 
+    def add_events(self, trace_id: str, events: List[TraceEvent]):
+        """Add several events to a trace at once."""
+        # For now, just log
+        print(f"Adding {len(events)} events to trace {trace_id}")
+        return True
+
+    def batch(self, trace_id: str) -> EventBatch:
+        """Create a batch that buffers events and sends them together."""
+        return EventBatch(self, trace_id)
+
     def update_span(
         self,
         span_id: str,
@@ -79,45 +232,177 @@ class TraceloopClient:
         return True
 
     def send_trace(self, trace: Trace) -> bool:
-        """Send a trace to the server."""
-        try:
-            # Convert trace to dict for JSON serialization
-            trace_data = {
-                "trace_id": trace.trace_id,
-                "name": trace.name,
-                "start_time": trace.start_time.isoformat(),
-                "end_time": trace.end_time.isoformat() if trace.end_time else None,
-                "status": trace.status.value,
-                "spans": [
-                    {
-                        "span_id": span.span_id,
-                        "trace_id": span.trace_id,
-                        "parent_span_id": span.parent_span_id,
-                        "name": span.name,
-                        "start_time": span.start_time.isoformat(),
-                        "end_time": (
-                            span.end_time.isoformat() if span.end_time else None
-                        ),
-                        "status": span.status.value,
-                        "attributes": span.attributes,
-                        "events": span.events,
-                    }
-                    for span in trace.spans
-                ],
-                "attributes": trace.attributes,
-                "service_name": trace.service_name,
-            }
+        """Queue a trace to be sent to the server in the next batch."""
+        with self._condition:
+            if self._shutdown:
+                return False
+            self._queue.append(trace)
+            if self._worker is None:
+                self._start_worker()
+            if len(self._queue) >= self.max_batch_size:
+                self._condition.notify()
+        return True
+
+    def flush(self) -> bool:
+        """Send all queued traces now, on the calling thread."""
+        success = True
+        while True:
+            with self._condition:
+                batch = self._drain()
+            if not batch:
+                return success
+            success = self._post_batch(batch) and success
+
+    def shutdown(self):
+        """Stop the background worker after sending any queued traces."""
+        _live_clients.discard(self)
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout=5)
+        self.flush()
 
+    def _start_worker(self):
+        self._worker = threading.Thread(
+            target=self._flush_loop,
+            args=(weakref.ref(self),),
+            name="traceloop-flush",
+            daemon=True,
+        )
+        self._worker.start()
+        _live_clients.add(self)
+
+    @staticmethod
+    def _flush_loop(client_ref: "weakref.ref[TraceloopClient]"):
+        # The client is only referenced weakly between batches, so one that is
+        # no longer used elsewhere can be collected; its worker then exits.
+        # Call shutdown() or flush() first to send what it still has queued.
+        while True:
+            client = client_ref()
+            if client is None:
+                return
+            with client._condition:
+                if not client._shutdown and len(client._queue) < client.max_batch_size:
+                    client._condition.wait(client.flush_interval)
+                if client._shutdown:
+                    # shutdown() flushes whatever is left on its own thread
+                    return
+                batch = client._drain()
+            if batch:
+                client._post_batch(batch)
+            del client
+
+    def _drain(self) -> List[Trace]:
+        """Pop up to max_batch_size traces; the caller holds the condition."""
+        count = min(len(self._queue), self.max_batch_size)
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _post_batch(self, traces: List[Trace]) -> bool:
+        """Send a batch of traces to the server in a single request."""
+        try:
             response = self.session.post(
-                f"{self.endpoint}/api/v1/traces", json=trace_data, timeout=5
+                f"{self.endpoint}/api/v1/traces/batch",
+                data=_encode_batch([self._trace_to_dict(trace) for trace in traces]),
+                timeout=5,
             )
 
             if response.status_code == 200:
                 return True
             else:
-                print(f"Failed to send trace: {response.status_code} - {response.text}")
+                print(
+                    f"Failed to send traces: {response.status_code} - {response.text}"
+                )
                 return False
 
         except Exception as e:
-            print(f"Error sending trace: {e}")
+            print(f"Error sending traces: {e}")
             return False
+
+    @staticmethod
+    def _trace_to_dict(trace: Trace) -> Dict[str, Any]:
+        """Convert a trace to a dict for JSON serialization.
+
+        Datetimes are left as-is; orjson encodes them as ISO-8601 natively.
+        Integer timestamps are converted to UTC datetimes first, so the trace
+        times are always ISO-8601 strings.
+        """
+        return {
+            "trace_id": trace.trace_id,
+            "name": trace.name,
+            "start_time": _to_datetime(trace.start_time),
+            "end_time": _to_datetime(trace.end_time),
+            "status": trace.status.value,
+            "spans": [TraceloopClient._span_to_dict(span) for span in trace.spans],
+            "attributes": trace.attributes,
+            "service_name": trace.service_name,
+        }
+
+    @staticmethod
+    def _span_to_dict(span: Span) -> Dict[str, Any]:
+        """Convert a span to a dict, omitting fields that are unset or empty.
+
+        Span times are sent as integer nanoseconds since the Unix epoch, which
+        are cheaper to encode and smaller than ISO-8601 strings.
+
+        The trace ID is sent once on the enclosing trace; the server copies it
+        onto each span.
+        """
+        span_data = {
+            "span_id": span.span_id,
+            "name": span.name,
+            "start_time_unix_nano": _unix_nano(span.start_time),
+            "status": span.status.value,
+        }
+        if span.parent_span_id:
+            span_data["parent_span_id"] = span.parent_span_id
+        if span.end_time:
+            span_data["end_time_unix_nano"] = _unix_nano(span.end_time)
+        if span.attributes:
+            span_data["attributes"] = span.attributes
+        if span.events:
+            span_data["events"] = span.events
+        return span_data
+
+
+class _NoopClient(TraceloopClient):
+    """Client used before traceloop.init(); it records and sends nothing."""
+
+    def __init__(self):
+        self.endpoint = ""
+        self.api_key = None
+        self.service_name = None
+        # Root calls are never sampled, so decorated functions run untraced
+        self.sample_rate = 0.0
+
+    def start_trace(self, name: str, **attributes) -> TraceContext:
+        # Unsampled, so nested calls skip their bookkeeping; a new context each
+        # time so nothing set on one trace is seen by another
+        return TraceContext(trace_id="", span_id=None, service_name=None, sampled=False)
+
+    def end_trace(self, trace_id: str, status: TraceStatus = TraceStatus.OK):
+        return True
+
+    def add_event(self, trace_id: str, name: str, **attributes):
+        return True
+
+    def add_events(self, trace_id: str, events: List[TraceEvent]):
+        return True
+
+    def update_span(
+        self,
+        span_id: str,
+        attributes: Dict[str, Any],
+        status: TraceStatus = TraceStatus.OK,
+    ):
+        return True
+
+    def send_trace(self, trace: Trace) -> bool:
+        return True
+
+    def flush(self) -> bool:
+        return True
+
+    def shutdown(self):
+        pass
@@ -2,58 +2,79 @@
 Context management for traces and spans.
 """
 
-import threading
-from typing import Any, Optional
+from contextvars import ContextVar
+from typing import NamedTuple, Optional, Tuple
 
+from .ids import generate_span_id
 from .types import TraceContext
 
-# Thread-local storage for trace context
-_context = threading.local()
 
+class SpanContext(NamedTuple):
+    """An open span in the current context."""
 
-def get_current_trace() -> Optional[TraceContext]:
-    """Get the current trace context from thread-local storage."""
-    return getattr(_context, "current_trace", None)
+    name: str
+    trace_id: str
+    span_id: str
 
 
-def set_current_trace(trace_context: TraceContext):
-    """Set the current trace context in thread-local storage."""
-    _context.current_trace = trace_context
+# Context variables are per thread and per asyncio task, so concurrent
+# coroutines on one thread each see their own trace
+_current_trace: ContextVar[Optional[TraceContext]] = ContextVar(
+    "traceloop_current_trace", default=None
+)
+# Open spans, innermost last; a tuple so copies between contexts are cheap
+_span_stack: ContextVar[Tuple[SpanContext, ...]] = ContextVar(
+    "traceloop_span_stack", default=()
+)
+
+# Get the current trace context; bound directly to the context variable so a
+# lookup is a single C call
+get_current_trace = _current_trace.get
+
+
+def set_current_trace(trace_context: Optional[TraceContext]):
+    """Set the current trace context."""
+    _current_trace.set(trace_context)
 
 
 def create_span_context(name: str, trace_id: str) -> str:
-    """Create a new span context."""
-    import uuid
+    """Create a new span context and make it the current span."""
+    span_id = generate_span_id()
+    _span_stack.set(_span_stack.get() + (SpanContext(name, trace_id, span_id),))
+    return span_id
 
-    span_id = str(uuid.uuid4())
 
-    # Store span context in thread-local storage
-    if not hasattr(_context, "spans"):
-        _context.spans = {}
+def end_span_context(span_id: str):
+    """Remove a span from the open spans once it has finished."""
+    stack = _span_stack.get()
+    if stack and stack[-1].span_id == span_id:
+        _span_stack.set(stack[:-1])
+    else:
+        _span_stack.set(tuple(span for span in stack if span.span_id != span_id))
 
-    _context.spans[span_id] = {"name": name, "trace_id": trace_id, "span_id": span_id}
 
-    return span_id
+def get_current_span() -> Optional[SpanContext]:
+    """Get the innermost open span in the current context."""
+    stack = _span_stack.get()
+    return stack[-1] if stack else None
 
 
-def get_span_context(span_id: str) -> Optional[dict[Any, Any]]:
-    """Get span context by ID."""
-    if not hasattr(_context, "spans"):
-        return None
-    result = _context.spans.get(span_id)
-    return result if result is not None else None
+def get_span_context(span_id: str) -> Optional[SpanContext]:
+    """Get an open span context by ID."""
+    for span_context in reversed(_span_stack.get()):
+        if span_context.span_id == span_id:
+            return span_context
+    return None
 
 
 def set_trace_attribute(key: str, value):
     """Set an attribute on the current trace."""
-    trace = get_current_trace()
-    if trace:
+    trace = _current_trace.get()
+    if trace is not None and trace.sampled:
         trace.attributes[key] = value
 
 
 def clear_context():
     """Clear the current trace context."""
-    if hasattr(_context, "current_trace"):
-        delattr(_context, "current_trace")
-    if hasattr(_context, "spans"):
-        delattr(_context, "spans")
+    _current_trace.set(None)
+    _span_stack.set(())
@@ -2,22 +2,70 @@
 Decorators for automatic tracing of functions and methods.
 """
 
+import asyncio
 import functools
 import inspect
+import os
+import random
 import time
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Dict, Optional, TypeVar
 
-from .context import create_span_context, get_current_trace
-from .types import TraceStatus
+from .context import (
+    create_span_context,
+    end_span_context,
+    get_current_trace,
+    set_current_trace,
+)
+from .types import TraceContext, TraceStatus
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Values recorded as-is; anything else is recorded by type name. Ordered with
+# the most common argument types first since isinstance checks them in turn.
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+_RESULT_TYPES = (str, int, float, bool)
+
+# Global switch checked before any per-call tracing work is done
+_tracing_enabled = True
+
+
+def set_enabled(enabled: bool):
+    """Enable or disable tracing for all decorated functions."""
+    global _tracing_enabled
+    _tracing_enabled = enabled
+
+
+# traceloop.get_client, bound on first use; the package imports this module
+# before get_client is defined, so it cannot be imported at module level
+_get_client: Optional[Callable[[], Any]] = None
+
+
+def _client():
+    """Return the default client, resolving traceloop.get_client only once."""
+    global _get_client
+    if _get_client is None:
+        from . import get_client
+
+        _get_client = get_client
+    return _get_client()
+
+
+def _sampled(sample_rate: float) -> bool:
+    """Decide whether a call is recorded under the given sample rate."""
+    return sample_rate >= 1.0 or random.random() < sample_rate
+
+
+def _disabled_by_env() -> bool:
+    """Whether TRACELOOP_DISABLED is set to a truthy value."""
+    return os.environ.get("TRACELOOP_DISABLED", "").lower() in ("1", "true", "yes")
+
 
 def trace(
     name: Optional[str] = None,
     capture_args: bool = True,
     capture_result: bool = True,
     ignore_errors: bool = False,
+    sample_rate: Optional[float] = None,
     **span_attributes,
 ) -> Callable[[F], F]:
     """
@@ -28,6 +76,8 @@ def trace(
         capture_args: Whether to capture function arguments as span attributes
         capture_result: Whether to capture function return value as span attribute
         ignore_errors: Whether to continue tracing even if function raises exception
+        sample_rate: Fraction of root calls to trace. Defaults to the client's
+            sample rate; nested calls follow the decision made for their root.
         **span_attributes: Additional attributes to add to the span
 
     Returns:
@@ -35,86 +85,193 @@ def trace(
     """
 
     def decorator(func: F) -> Any:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # Determine span name
-            span_name = name or f"{func.__module__}.{func.__qualname__}"
-
-            # Get or create trace context
-            trace_context = get_current_trace()
-            if trace_context is None:
-                from . import get_client
+        # Leave the function untouched when tracing is switched off for the process
+        if _disabled_by_env():
+            return func
+
+        # Resolved once per decorated function rather than on every call
+        _now = time.perf_counter_ns
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+        static_attributes = {
+            "function.name": func.__name__,
+            "function.module": func.__module__,
+            "function.qualname": func.__qualname__,
+            **span_attributes,
+        }
 
-                client = get_client()
+        if capture_args:
+            sig = inspect.signature(func)
+            param_names = tuple(sig.parameters)
+            defaults = {
+                param_name: param.default
+                for param_name, param in sig.parameters.items()
+                if param.default is not inspect.Parameter.empty
+            }
+            # Without *args/**kwargs, arguments can be matched to names directly
+            simple_signature = all(
+                param.kind
+                not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+                for param in sig.parameters.values()
+            )
+
+            def bind_arguments(args, kwargs):
+                """Map call arguments, including defaults, to parameter names."""
+                if not simple_signature:
+                    bound_args = sig.bind(*args, **kwargs)
+                    bound_args.apply_defaults()
+                    return bound_args.arguments
+
+                arguments = dict(zip(param_names, args))
+                arguments.update(kwargs)
+                for param_name, default in defaults.items():
+                    arguments.setdefault(param_name, default)
+                return arguments
+
+        def start_root(client):
+            """Start the trace for a root call and make it current.
+
+            The sampling decision is made here, once per trace, and stored on
+            the trace context for nested calls to inherit.
+            """
+            rate = client.sample_rate if sample_rate is None else sample_rate
+            if _sampled(rate):
                 trace_context = client.start_trace(span_name)
-
+            else:
+                # Made per call so nothing set on it can leak to other traces
+                trace_context = TraceContext(
+                    trace_id="", span_id=None, service_name=None, sampled=False
+                )
+            set_current_trace(trace_context)
+            return trace_context
+
+        def start_span(trace_context, args, kwargs):
+            """Open a span for one call and capture its arguments."""
             # Create span
             span_id = create_span_context(span_name, trace_context.trace_id)
 
-            # Capture function metadata
-            attributes = {
-                "function.name": func.__name__,
-                "function.module": func.__module__,
-                "function.qualname": func.__qualname__,
-                **span_attributes,
-            }
+            # Start from the function metadata, which is the same for every call
+            attributes = static_attributes.copy()
 
             # Capture arguments if requested
             if capture_args:
-                sig = inspect.signature(func)
-                bound_args = sig.bind(*args, **kwargs)
-                bound_args.apply_defaults()
-
-                for param_name, param_value in bound_args.arguments.items():
+                for param_name, param_value in bind_arguments(args, kwargs).items():
                     # Only capture serializable argument values
-                    if isinstance(param_value, (str, int, float, bool, type(None))):
+                    if isinstance(param_value, _SCALAR_TYPES):
                         attributes[f"function.args.{param_name}"] = param_value
                     else:
                         attributes[f"function.args.{param_name}.type"] = type(
                             param_value
                         ).__name__
 
-            start_time = time.time()
-            status = TraceStatus.OK
-            error_msg = None
-            result = None
+            return span_id, attributes
+
+        def end_span(client, span_id, attributes, status, start_ns):
+            """Record the call duration and update the span."""
+            attributes["function.duration_ms"] = (_now() - start_ns) / 1_000_000
+            end_span_context(span_id)
+
+            # Update span with final attributes
+            client.update_span(span_id, attributes, status)
+
+        def begin(args, kwargs):
+            """Start tracing one call.
+
+            Returns None when nothing has to happen once the call returns.
+            Otherwise returns the state for finish(): (client, span_id,
+            attributes, start_ns, is_root). span_id is None for an unsampled
+            root call, which only has to clear its trace context afterwards.
+            """
+            if not _tracing_enabled:
+                return None
+            client = _client()
+            parent = get_current_trace()
+            trace_context = parent or start_root(client)
+            is_root = parent is None
+            if not trace_context.sampled:
+                return (client, None, None, 0, True) if is_root else None
+
+            span_id, attributes = start_span(trace_context, args, kwargs)
+            return client, span_id, attributes, _now(), is_root
+
+        def finish(state, result, error):
+            """Record the outcome of a call started by begin()."""
+            client, span_id, attributes, start_ns, is_root = state
+            if span_id is not None:
+                status = TraceStatus.OK
+                if isinstance(error, asyncio.CancelledError):
+                    status = TraceStatus.CANCELLED
+                elif error is not None:
+                    status = TraceStatus.ERROR
+                    _capture_error(attributes, error)
+                elif capture_result:
+                    _capture_result(attributes, result)
+                end_span(client, span_id, attributes, status, start_ns)
+            if is_root:
+                set_current_trace(None)
+
+        # The two wrappers differ only in awaiting the call
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                state = begin(args, kwargs)
+                if state is None:
+                    return await func(*args, **kwargs)
+
+                result = error = None
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                except asyncio.CancelledError as e:
+                    # A BaseException, so not caught below; always re-raised
+                    error = e
+                    raise
+                except Exception as e:
+                    error = e
+                    if not ignore_errors:
+                        raise
+                finally:
+                    finish(state, result, error)
 
-            try:
-                result = func(*args, **kwargs)
+            return async_wrapper
 
-                # Capture result if requested
-                if capture_result and result is not None:
-                    if isinstance(result, (str, int, float, bool)):
-                        attributes["function.result"] = result
-                    else:
-                        attributes["function.result.type"] = type(result).__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            state = begin(args, kwargs)
+            if state is None:
+                return func(*args, **kwargs)
 
+            result = error = None
+            try:
+                result = func(*args, **kwargs)
                 return result
-
             except Exception as e:
-                status = TraceStatus.ERROR
-                error_msg = str(e)
-                attributes["error.type"] = type(e).__name__
-                attributes["error.message"] = error_msg
-
+                error = e
                 if not ignore_errors:
                     raise
-
             finally:
-                end_time = time.time()
-                attributes["function.duration_ms"] = (end_time - start_time) * 1000
-
-                # Update span with final attributes
-                from . import get_client
-
-                client = get_client()
-                client.update_span(span_id, attributes, status)
+                finish(state, result, error)
 
         return wrapper
 
     return decorator
 
 
+def _capture_result(attributes: Dict[str, Any], result: Any):
+    """Record a function's return value (or its type) as span attributes."""
+    if result is not None:
+        if isinstance(result, _RESULT_TYPES):
+            attributes["function.result"] = result
+        else:
+            attributes["function.result.type"] = type(result).__name__
+
+
+def _capture_error(attributes: Dict[str, Any], error: Exception):
+    """Record an exception raised by a traced function."""
+    attributes["error.type"] = type(error).__name__
+    attributes["error.message"] = str(error)
+
+
 def trace_agent(
     agent_name: Optional[str] = None,
     capture_inputs: bool = True,
@@ -0,0 +1,22 @@
+"""
+Trace and span ID generation.
+"""
+
+import os
+from typing import Tuple
+
+
+def generate_trace_id() -> str:
+    """Generate a random 128-bit trace ID as 32 hex characters."""
+    return os.urandom(16).hex()
+
+
+def generate_span_id() -> str:
+    """Generate a random 64-bit span ID as 16 hex characters."""
+    return os.urandom(8).hex()
+
+
+def generate_trace_and_span_ids() -> Tuple[str, str]:
+    """Generate a trace ID and a root span ID from a single random read."""
+    raw = os.urandom(24)
+    return raw[:16].hex(), raw[16:].hex()
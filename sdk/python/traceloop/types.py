@@ -2,12 +2,20 @@
 Type definitions for the Traceloop SDK.
 """
 
-import uuid
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
+from .ids import generate_span_id, generate_trace_id
+
+# A point in time: a datetime, or integer nanoseconds since the Unix epoch
+Timestamp = Union[datetime, int]
+
+# Slotted dataclasses drop the per-instance __dict__; slots=True needs Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class TraceStatus(Enum):
     """Status of a trace or span."""
@@ -18,7 +26,7 @@ class TraceStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Span:
     """Represents a span within a trace."""
 
@@ -26,68 +34,54 @@ class Span:
     trace_id: str
     parent_span_id: Optional[str]
     name: str
-    start_time: datetime
-    end_time: Optional[datetime]
+    start_time: Timestamp
+    end_time: Optional[Timestamp]
     status: TraceStatus
-    attributes: Dict[str, Any]
-    events: List[Dict[str, Any]]
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
 
     def __post_init__(self):
         if not self.span_id:
-            self.span_id = str(uuid.uuid4())
-        if self.events is None:
-            self.events = []
-        if self.attributes is None:
-            self.attributes = {}
+            self.span_id = generate_span_id()
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Trace:
     """Represents a complete trace."""
 
     trace_id: str
     name: str
-    start_time: datetime
-    end_time: Optional[datetime]
+    start_time: Timestamp
+    end_time: Optional[Timestamp]
     status: TraceStatus
-    spans: List[Span]
-    attributes: Dict[str, Any]
-    service_name: Optional[str]
+    spans: List[Span] = field(default_factory=list)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    service_name: Optional[str] = None
 
     def __post_init__(self):
         if not self.trace_id:
-            self.trace_id = str(uuid.uuid4())
-        if self.spans is None:
-            self.spans = []
-        if self.attributes is None:
-            self.attributes = {}
+            self.trace_id = generate_trace_id()
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TraceEvent:
     """Represents an event within a trace/span."""
 
     name: str
-    timestamp: datetime
-    attributes: Dict[str, Any]
-
-    def __post_init__(self):
-        if self.attributes is None:
-            self.attributes = {}
+    timestamp: Timestamp
+    attributes: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TraceContext:
     """Context information for the current trace."""
 
     trace_id: str
     span_id: Optional[str]
     service_name: Optional[str]
-    attributes: Dict[str, Any]
-
-    def __post_init__(self):
-        if self.attributes is None:
-            self.attributes = {}
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    # False when the trace is not recorded; calls within it skip tracing
+    sampled: bool = True
 
 
 # Type aliases for common data structures
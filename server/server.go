@@ -114,6 +114,7 @@ func (s *Server) setupRoutes(router *gin.Engine) {
 	{
 		api.GET("/traces", s.handleGetTraces)
 		api.POST("/traces", s.handleStoreTrace)
+		api.POST("/traces/batch", s.handleStoreTraces)
 		api.GET("/traces/:id", s.handleGetTrace)
 		api.GET("/stats", s.handleGetStats)
 	}
@@ -151,6 +152,21 @@ func (s *Server) handleStoreTrace(c *gin.Context) {
 	c.JSON(http.StatusOK, gin.H{"status": "stored"})
 }
 
+func (s *Server) handleStoreTraces(c *gin.Context) {
+	var traces []map[string]interface{}
+	if err := c.ShouldBindJSON(&traces); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"error": err.Error()})
+		return
+	}
+
+	if err := s.storage.StoreTraces(context.Background(), traces); err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{"error": err.Error()})
+		return
+	}
+
+	c.JSON(http.StatusOK, gin.H{"status": "stored", "count": len(traces)})
+}
+
 func (s *Server) handleGetTrace(c *gin.Context) {
 	id := c.Param("id")
 	trace, err := s.storage.GetTrace(context.Background(), id)
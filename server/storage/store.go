@@ -15,6 +15,7 @@ type Store interface {
 	GetTrace(ctx context.Context, id string) (map[string]interface{}, error)
 	GetStats(ctx context.Context) (map[string]interface{}, error)
 	StoreTrace(ctx context.Context, trace map[string]interface{}) error
+	StoreTraces(ctx context.Context, traces []map[string]interface{}) error
 	Close() error
 }
 
@@ -116,23 +117,66 @@ func (s *BadgerStore) GetTrace(ctx context.Context, id string) (map[string]inter
 
 // StoreTrace stores a trace in the database
 func (s *BadgerStore) StoreTrace(ctx context.Context, trace map[string]interface{}) error {
+	key, data, err := encodeTrace(trace)
+	if err != nil {
+		return err
+	}
+
+	// Store in BadgerDB
+	return s.db.Update(func(txn *badger.Txn) error {
+		return txn.Set(key, data)
+	})
+}
+
+// StoreTraces stores a batch of traces in a single transaction
+func (s *BadgerStore) StoreTraces(ctx context.Context, traces []map[string]interface{}) error {
+	keys := make([][]byte, len(traces))
+	values := make([][]byte, len(traces))
+	for i, trace := range traces {
+		key, data, err := encodeTrace(trace)
+		if err != nil {
+			return err
+		}
+		keys[i] = key
+		values[i] = data
+	}
+
+	return s.db.Update(func(txn *badger.Txn) error {
+		for i := range keys {
+			if err := txn.Set(keys[i], values[i]); err != nil {
+				return err
+			}
+		}
+		return nil
+	})
+}
+
+// encodeTrace returns the storage key and JSON encoding of a trace
+func encodeTrace(trace map[string]interface{}) ([]byte, []byte, error) {
 	// Extract trace ID
 	traceID, ok := trace["trace_id"].(string)
 	if !ok {
-		return fmt.Errorf("trace_id is required")
+		return nil, nil, fmt.Errorf("trace_id is required")
+	}
+
+	// Clients send the trace ID once per trace; copy it onto spans that omit it
+	if spans, ok := trace["spans"].([]interface{}); ok {
+		for _, s := range spans {
+			if span, ok := s.(map[string]interface{}); ok {
+				if _, set := span["trace_id"]; !set {
+					span["trace_id"] = traceID
+				}
+			}
+		}
 	}
 
 	// Serialize trace to JSON
 	data, err := json.Marshal(trace)
 	if err != nil {
-		return fmt.Errorf("failed to marshal trace: %w", err)
+		return nil, nil, fmt.Errorf("failed to marshal trace: %w", err)
 	}
 
-	// Store in BadgerDB
-	key := []byte("trace:" + traceID)
-	return s.db.Update(func(txn *badger.Txn) error {
-		return txn.Set(key, data)
-	})
+	return []byte("trace:" + traceID), data, nil
 }
 
 // GetStats retrieves storage statistics
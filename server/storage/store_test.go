@@ -96,3 +96,79 @@ func TestBadgerStore_StoreTrace(t *testing.T) {
 		t.Errorf("Expected trace_id 'test-trace-1', got %v", retrievedTrace["trace_id"])
 	}
 }
+
+func TestBadgerStore_StoreTraces(t *testing.T) {
+	// Clean up any existing test data
+	os.RemoveAll("/tmp/traceloop-test")
+
+	// Create a temporary store
+	store, err := NewBadgerStore("/tmp/traceloop-test")
+	if err != nil {
+		t.Fatalf("Failed to create store: %v", err)
+	}
+	defer func() {
+		store.Close()
+		os.RemoveAll("/tmp/traceloop-test")
+	}()
+
+	// Test storing a batch of traces
+	traces := []map[string]interface{}{
+		{"trace_id": "test-trace-1", "name": "first", "status": "ok"},
+		{"trace_id": "test-trace-2", "name": "second", "status": "ok"},
+	}
+
+	err = store.StoreTraces(context.Background(), traces)
+	if err != nil {
+		t.Fatalf("Failed to store traces: %v", err)
+	}
+
+	// Test that every trace in the batch was stored
+	stored, err := store.GetTraces(context.Background(), 10)
+	if err != nil {
+		t.Fatalf("Failed to get traces: %v", err)
+	}
+
+	if len(stored) != 2 {
+		t.Errorf("Expected 2 traces, got %d", len(stored))
+	}
+}
+
+func TestBadgerStore_StoreTraceFillsSpanTraceID(t *testing.T) {
+	// Clean up any existing test data
+	os.RemoveAll("/tmp/traceloop-test")
+
+	// Create a temporary store
+	store, err := NewBadgerStore("/tmp/traceloop-test")
+	if err != nil {
+		t.Fatalf("Failed to create store: %v", err)
+	}
+	defer func() {
+		store.Close()
+		os.RemoveAll("/tmp/traceloop-test")
+	}()
+
+	// Test storing a trace whose spans omit trace_id, as the SDK sends them
+	trace := map[string]interface{}{
+		"trace_id": "test-trace-1",
+		"name":     "test-trace",
+		"spans": []interface{}{
+			map[string]interface{}{"span_id": "span-1", "name": "span-1"},
+		},
+	}
+
+	err = store.StoreTrace(context.Background(), trace)
+	if err != nil {
+		t.Fatalf("Failed to store trace: %v", err)
+	}
+
+	retrievedTrace, err := store.GetTrace(context.Background(), "test-trace-1")
+	if err != nil {
+		t.Fatalf("Failed to get trace: %v", err)
+	}
+
+	spans := retrievedTrace["spans"].([]interface{})
+	span := spans[0].(map[string]interface{})
+	if span["trace_id"] != "test-trace-1" {
+		t.Errorf("Expected span trace_id 'test-trace-1', got %v", span["trace_id"])
+	}
+}
@@ -1,113 +1,385 @@
 #!/usr/bin/env python3
 """
 Test script to verify Python SDK functionality
+
+Run it directly, or under pytest; with pytest-xdist the tests can be spread
+over worker processes:
+
+    pytest -n auto test_python_sdk.py
 """
 
+import argparse
 import sys
 import os
+import contextvars
+import functools
+import http.client
+import json
+import logging
+import threading
 import time
-import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("traceloop.test")
+
+# Records logged by the check running in this context; None outside a check
+_check_records = contextvars.ContextVar("check_records", default=None)
+
+class CheckRecordsFilter(logging.Filter):
+    """Hold back records logged during a check in that check's own list"""
+    def filter(self, record):
+        records = _check_records.get()
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+class OutputBuffer(logging.Handler):
+    """Keep formatted records so they can be written to stdout in one call"""
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+    def flush(self):
+        with self.lock:
+            if self.lines:
+                sys.stdout.write("\n".join(self.lines) + "\n")
+                sys.stdout.flush()
+                self.lines.clear()
 
-# Add the SDK to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'sdk', 'python'))
+def configure_logging(level):
+    """Log to stdout, buffered so the output is written when main() finishes"""
+    handler = OutputBuffer()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.addFilter(CheckRecordsFilter())
+    logger.setLevel(level)
+    logger.propagate = False
+    return handler
 
 try:
     import traceloop
-    from traceloop.types import Trace, Span, TraceStatus
-    print("✅ Traceloop SDK imported successfully")
-except ImportError as e:
-    print(f"❌ Failed to import traceloop: {e}")
-    sys.exit(1)
+except ImportError:
+    # Not installed; fall back to the SDK sources in this checkout
+    import importlib
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'sdk', 'python'))
+    importlib.invalidate_caches()
+    try:
+        import traceloop
+    except ImportError as e:
+        print(f"❌ Failed to import traceloop: {e}")
+        sys.exit(1)
+
+from traceloop.types import Trace, Span, TraceStatus
+
+# Loopback address rather than "localhost" so no name lookup is needed per call
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+ENDPOINT = f"http://{SERVER_HOST}:{SERVER_PORT}"
+HEALTH_PATH = "/health"
+# Fail fast when nothing is listening, but give the server time to respond
+HEALTH_TIMEOUT = (0.5, 5.0)  # (connect, read) seconds
+# Hard cap on the whole check, including the retry and anything the socket
+# timeouts do not cover
+HEALTH_DEADLINE = 6.0  # seconds
+
+# Recent failed health check, so repeated runs against a down server return at
+# once. Only failures are cached; a server that was up is always probed again.
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".traceloop_test_cache.json")
+CACHE_TTL = 30  # seconds
+
+# Status message templates, formatted with % at the call site
+_MSG_INIT_FAILED = "❌ Client initialization failed: %s"
+_MSG_CASE_PASSED = "✅ %s works"
+_MSG_CASE_FAILED = "❌ %s failed: %s"
+_MSG_BAD_STATUS = "❌ Server returned status %d"
+_MSG_CONNECT_FAILED = (
+    "❌ Cannot connect to server: %s\n"
+    "💡 Make sure to start the server with: ./build/traceloop server"
+)
+_MSG_SERVER_DOWN = "\n❌ Server connection failed. Please start the server first."
+_MSG_BASIC_FAILED = "\n❌ Basic functionality tests failed."
+_MSG_CACHED_DOWN = "💾 Server was down less than %ds ago; skipping the check"
+_MSG_DEADLINE = "❌ Server did not respond within %ss"
+_MSG_BENCH_START = "\n⏱️  Constructing %d traces and spans..."
+_MSG_BENCH_RESULT = "✅ %.2f µs per trace + span (%.3fs total)"
+
+# Fixed timestamp for the objects built below, so runs are reproducible. The
+# SDK accepts integer nanoseconds since the Unix epoch wherever it takes a
+# datetime; this is 2024-01-01T00:00:00Z.
+_FROZEN_NOW = 1_704_067_200_000_000_000
+
+# Kept open across requests; HTTP/1.1 keeps the connection alive by default
+_CONNECTION = None
+
+def get_connection():
+    """Return the shared server connection, creating it on first use."""
+    global _CONNECTION
+    if _CONNECTION is None:
+        _CONNECTION = http.client.HTTPConnection(SERVER_HOST, SERVER_PORT)
+    return _CONNECTION
+
+def get_health_status():
+    """Request the health endpoint and return the response status"""
+    connection = get_connection()
+    if connection.sock is None:
+        connect_timeout, read_timeout = HEALTH_TIMEOUT
+        connection.timeout = connect_timeout
+        connection.connect()
+        connection.sock.settimeout(read_timeout)
+    connection.request("GET", HEALTH_PATH)
+    response = connection.getresponse()
+    response.read()
+    return response.status
 
-def test_basic_functionality():
+def fail(message):
+    """Fail the running check; passes() reports the message"""
+    # Raised explicitly rather than via assert so the checks still run under -O
+    raise AssertionError(message)
+
+def passes(check):
+    """Run a check and report whether it passed, logging why if it did not"""
+    try:
+        check()
+        return True
+    except AssertionError as e:
+        logger.error("%s", e)
+        return False
+
+def run_check(check):
+    """Run a check, returning whether it passed and the records it logged"""
+    records = []
+    token = _check_records.set(records)
+    try:
+        return passes(check), records
+    finally:
+        _check_records.reset(token)
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """Initialize the SDK for ENDPOINT once; later calls reuse that client"""
+    return traceloop.init(endpoint=ENDPOINT)
+
+def init_client():
+    """Initialize the client shared by the tests"""
+    try:
+        client = get_client()
+    except Exception as e:
+        fail(_MSG_INIT_FAILED % e)
+    logger.info("✅ Client initialized successfully")
+    return client
+
+def make_trace(now):
+    """Build a trace with every field set"""
+    return Trace(
+        trace_id="test-trace-1",
+        name="test-trace",
+        start_time=now,
+        end_time=None,
+        status=TraceStatus.OK,
+        spans=[],
+        attributes={},
+        service_name="test-service"
+    )
+
+def make_span(now):
+    """Build a span with every field set"""
+    return Span(
+        span_id="test-span-1",
+        trace_id="test-trace-1",
+        parent_span_id=None,
+        name="test-span",
+        start_time=now,
+        end_time=None,
+        status=TraceStatus.OK,
+        attributes={},
+        events=[]
+    )
+
+# Checks run by run_basic_functionality: (description, builder taking a timestamp)
+CASES = [
+    ("Trace creation", make_trace),
+    ("Span creation", make_span),
+]
+
+# The SDK types use slotted dataclasses where Python supports them (3.10+)
+SLOTTED_TYPES = sys.version_info >= (3, 10)
+
+def test_object_creation(client, now, case):
+    """Test trace and span creation; conftest.py parametrizes case over CASES"""
+    description, build = case
+    obj = build(now)
+    if SLOTTED_TYPES:
+        assert not hasattr(obj, "__dict__"), f"{description}: instance has a __dict__"
+
+def run_basic_functionality():
     """Test basic SDK functionality"""
-    print("\n🧪 Testing basic functionality...")
+    logger.info("\n🧪 Testing basic functionality...")
+    
+    init_client()
+    
+    passed, failed = [], []
+    for description, build in CASES:
+        try:
+            obj = build(_FROZEN_NOW)
+            if SLOTTED_TYPES and hasattr(obj, "__dict__"):
+                raise TypeError("instance has a __dict__")
+            passed.append(description)
+        except Exception as e:
+            failed.append((description, e))
+    
+    for description in passed:
+        logger.info(_MSG_CASE_PASSED, description)
+    for description, e in failed:
+        logger.error(_MSG_CASE_FAILED, description, e)
     
-    # Test client initialization
+    if failed:
+        fail(_MSG_BASIC_FAILED)
+
+def server_recently_down():
+    """Return whether a health check failed less than CACHE_TTL seconds ago"""
     try:
-        client = traceloop.init(endpoint="http://localhost:8080")
-        print("✅ Client initialized successfully")
-    except Exception as e:
-        print(f"❌ Client initialization failed: {e}")
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
         return False
     
-    # Test trace creation
+    return time.time() - cache.get("failed_at", 0) < CACHE_TTL
+
+def save_server_status(server_up):
+    """Record a failed health check for later runs, or forget an earlier one"""
+    try:
+        if server_up:
+            os.remove(CACHE_FILE)
+        else:
+            with open(CACHE_FILE, "w") as f:
+                json.dump({"failed_at": time.time()}, f)
+    except OSError:
+        pass
+
+def check_server():
+    """Probe the server's health endpoint, failing unless it responds with 200"""
     try:
-        now = datetime.now()
-        trace = Trace(
-            trace_id="test-trace-1",
-            name="test-trace",
-            start_time=now,
+        try:
+            status = get_health_status()
+        except (ConnectionError, http.client.HTTPException):
+            # The server may have closed the kept-alive connection; retry once
+            get_connection().close()
+            status = get_health_status()
+    except (OSError, http.client.HTTPException) as e:
+        fail(_MSG_CONNECT_FAILED % e)
+    
+    if status != 200:
+        fail(_MSG_BAD_STATUS % status)
+    logger.info("✅ Server is running and responding")
+
+def test_server_connection():
+    """Test connection to Traceloop server"""
+    logger.info("\n🌐 Testing server connection...")
+    
+    if server_recently_down():
+        logger.info(_MSG_CACHED_DOWN, CACHE_TTL)
+        fail(_MSG_SERVER_DOWN)
+    
+    # Probe on a daemon thread so a hung request cannot outlast the deadline
+    # Run it in a copy of this context so its output is kept with this check's
+    result = []
+    probe = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(lambda: result.append(passes(check_server)),),
+        daemon=True,
+    )
+    probe.start()
+    probe.join(HEALTH_DEADLINE)
+    if probe.is_alive():
+        logger.error(_MSG_DEADLINE, HEALTH_DEADLINE)
+    server_up = bool(result and result[0])
+    save_server_status(server_up)
+    if not server_up:
+        fail(_MSG_SERVER_DOWN)
+
+BENCH_ITERATIONS = 10_000
+
+def run_bench(iterations=BENCH_ITERATIONS):
+    """Time Trace and Span construction, the SDK's pure-Python hot path"""
+    logger.info(_MSG_BENCH_START, iterations)
+    
+    start = time.perf_counter()
+    for i in range(iterations):
+        Trace(
+            trace_id="bench-trace",
+            name="bench-trace",
+            start_time=_FROZEN_NOW,
             end_time=None,
             status=TraceStatus.OK,
-            spans=[],
-            attributes={},
             service_name="test-service"
         )
-        print("✅ Trace creation works")
-    except Exception as e:
-        print(f"❌ Trace creation failed: {e}")
-        return False
-    
-    # Test span creation
-    try:
-        span = Span(
-            span_id="test-span-1",
-            trace_id="test-trace-1",
+        Span(
+            span_id="bench-span",
+            trace_id="bench-trace",
             parent_span_id=None,
-            name="test-span",
-            start_time=now,
+            name="bench-span",
+            start_time=_FROZEN_NOW,
             end_time=None,
-            status=TraceStatus.OK,
-            attributes={},
-            events=[]
+            status=TraceStatus.OK
         )
-        print("✅ Span creation works")
-    except Exception as e:
-        print(f"❌ Span creation failed: {e}")
-        return False
+    elapsed = time.perf_counter() - start
     
-    return True
+    logger.info(_MSG_BENCH_RESULT, elapsed * 1e6 / iterations, elapsed)
 
-def test_server_connection():
-    """Test connection to Traceloop server"""
-    print("\n🌐 Testing server connection...")
-    
-    try:
-        response = requests.get("http://localhost:8080/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is running and responding")
-            return True
-        else:
-            print(f"❌ Server returned status {response.status_code}")
-            return False
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Cannot connect to server: {e}")
-        print("💡 Make sure to start the server with: ./build/traceloop server")
-        return False
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Verify the Traceloop Python SDK")
+    parser.add_argument(
+        "--bench", action="store_true",
+        help="only time Trace and Span construction; no server needed",
+    )
+    parser.add_argument(
+        "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="lowest level of output to show (default: INFO)",
+    )
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
     """Main test function"""
-    print("🚀 Traceloop Python SDK Test")
-    print("=" * 40)
+    args = parse_args(argv)
+    handler = configure_logging(args.log_level)
     
-    # Test server connection first
-    if not test_server_connection():
-        print("\n❌ Server connection failed. Please start the server first.")
-        return False
-    
-    # Test basic functionality
-    if not test_basic_functionality():
-        print("\n❌ Basic functionality tests failed.")
-        return False
+    logger.info("✅ Traceloop SDK imported successfully")
+    logger.info("🚀 Traceloop Python SDK Test")
+    logger.info("=" * 40)
     
-    print("\n✅ All tests passed! Python SDK is working correctly.")
-    print("\n📝 To use the SDK in your code:")
-    print("   import traceloop")
-    print("   traceloop.init(endpoint='http://localhost:8080')")
-    
-    return True
+    try:
+        # Construction benchmark only; needs no server
+        if args.bench:
+            run_bench()
+            return True
+        
+        # The checks are independent: overlap the network probe with the
+        # in-process object construction, then report both outcomes in order
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            server_check = executor.submit(run_check, test_server_connection)
+            basic_check = executor.submit(run_check, run_basic_functionality)
+            results = [server_check.result(), basic_check.result()]
+        for _, records in results:
+            for record in records:
+                logger.handle(record)
+        if not all(ok for ok, _ in results):
+            return False
+        
+        logger.info("\n✅ All tests passed! Python SDK is working correctly.")
+        logger.info("\n📝 To use the SDK in your code:")
+        logger.info("   import traceloop")
+        logger.info("   traceloop.init(endpoint='http://localhost:8080')")
+        
+        return True
+    finally:
+        if _CONNECTION is not None:
+            _CONNECTION.close()
+        handler.flush()
 
 if __name__ == "__main__":
     success = main()